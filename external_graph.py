@@ -0,0 +1,396 @@
+"""
+The ExternalShortestPathGraph object runs the Dijkstra Algorithm on graphs that are too large to be held in memory as a
+ShortestPathGraph. The graph is read from an edge file on disk, written by write_edge_file(), and only the distance
+array, the offsets of each node's edges in the file, a buffer of edges and a bounded priority queue are kept in memory.
+
+The nodes of an edge file are the integers 0 to n - 1, and like in Dijkstra's Algorithm, the edge costs must be
+non-negative.
+"""
+
+from array import array
+from itertools import islice
+import heapq
+import os
+import struct
+import tempfile
+
+from graph import INF, INT64_MAX
+
+HEADER = struct.Struct('<qq')  # number of nodes, number of edges
+EDGE_RECORD = struct.Struct('<qqq')  # source node, target node, cost
+QUEUE_RECORD = struct.Struct('<qq')  # distance, node, as stored in the spilled runs of the priority queue
+HEAP_ENTRY_SIZE = 72  # estimated memory used by one (distance, node) tuple in the in-memory heap
+RUN_BUFFER_RECORDS = 4096  # largest number of records read or written at once from a run
+MAX_RUNS = 16  # the runs are merged when there are more than this many, MAX_RUNS of them at a time
+DEFAULT_MEMORY_LIMIT = 256 * 2 ** 20  # 256 MB
+
+
+def _write_records(f, records, record, buffer_records=RUN_BUFFER_RECORDS):
+    """
+    writes the records to the file f, buffer_records of them at a time, so that records can be a generator over
+    more records than fit in memory. Returns the number of records written
+    """
+    records = iter(records)
+    written = 0
+    while True:
+        batch = list(islice(records, buffer_records))
+        if not batch:
+            return written
+        f.write(b''.join(record.pack(*r) for r in batch))
+        written += len(batch)
+
+
+def _write_run(records, record, directory, buffer_records=RUN_BUFFER_RECORDS):
+    """
+    writes the sorted records to a new temporary file, and returns the file positioned at its start, with the number
+    of records written
+    """
+    run = tempfile.TemporaryFile(dir=directory)
+    written = _write_records(run, records, record, buffer_records)
+    run.seek(0)
+    return run, written
+
+
+def _write_edge_run(edges, directory):
+    """
+    writes the sorted edges to a new named temporary file, which is closed, and returns its path. Unlike the runs of
+    _write_run(), these do not hold a file open while they wait to be merged
+    """
+    (handle, path) = tempfile.mkstemp(dir=directory)
+    with os.fdopen(handle, 'wb') as f:
+        _write_records(f, edges, EDGE_RECORD)
+    return path
+
+
+def _merge_edge_runs(paths):
+    """
+    yields the edges of the runs at paths, sorted by their source node. Each run is deleted once it has been read
+    """
+    def read(path):
+        try:
+            yield from _read_run(open(path, 'rb'), EDGE_RECORD)
+        finally:
+            os.remove(path)
+    return heapq.merge(*[read(path) for path in paths], key=lambda e: e[0])
+
+
+def _read_run(run, record, buffer_records=RUN_BUFFER_RECORDS):
+    """
+    yields the records of a temporary file written by _write_run(), reading buffer_records of them at a time.
+    The file, which is deleted when closed, is closed once all the records have been read or the generator is closed
+    """
+    try:
+        while True:
+            data = run.read(record.size * buffer_records)
+            if not data:
+                return
+            yield from record.iter_unpack(data)
+    finally:
+        run.close()
+
+
+def _fixed_memory(num_nodes):
+    """
+    returns the number of bytes used by the distance array, the edge offsets and the extracted flags of an
+    ExternalShortestPathGraph with num_nodes nodes
+    """
+    return 8 * num_nodes + 8 * (num_nodes + 1) + num_nodes
+
+
+def _run_buffer_memory(buffer_records):
+    """
+    returns the number of bytes used by the buffers of a _SpillingQueue reading and writing buffer_records records at
+    once: the read buffers of the MAX_RUNS + 1 runs it can have open, and the batch of records it is writing
+    """
+    return buffer_records * ((MAX_RUNS + 1) * QUEUE_RECORD.size + HEAP_ENTRY_SIZE + QUEUE_RECORD.size)
+
+
+def min_memory_limit(num_nodes):
+    """
+    returns the smallest memory_limit an ExternalShortestPathGraph with num_nodes nodes accepts. It leaves room for a
+    buffer of a few edges, run buffers of one record, and a priority queue of a few entries, so the queue spills to
+    disk almost at once
+    """
+    return _fixed_memory(num_nodes) + 2 * (EDGE_RECORD.size + 2 * _run_buffer_memory(1))
+
+
+def write_edge_file(path, num_nodes, edge_list, memory_limit=DEFAULT_MEMORY_LIMIT, directory=None):
+    """
+    writes the edges of a graph with nodes 0 to num_nodes - 1 to the file at path, in the format read by
+    ExternalShortestPathGraph. Edges are input as an iterable of tuples, (v,w,c) where v,w are Nodes and c is the
+    non-negative integer cost of the edge, and do not need to fit in memory: they are sorted in chunks of at most
+    memory_limit bytes, which are written to temporary files in directory and merged, MAX_RUNS at a time.
+    The file holds a header with the number of nodes and edges, then the offset of each node's first edge, then the
+    edges sorted by their source node.
+    A KeyError is raised if an edge has a node outside 0 to num_nodes - 1, and a ValueError if its cost is negative.
+    """
+    chunk_size = max(memory_limit // (2 * HEAP_ENTRY_SIZE), 1)
+    runs = []  # paths of the sorted runs waiting to be merged
+    merged = []  # paths of the runs written by the current merge pass
+    try:
+        edges = iter(edge_list)
+        while True:
+            chunk = list(islice(edges, chunk_size))
+            if not chunk:
+                break
+            for (v, w, c) in chunk:
+                if not (0 <= v < num_nodes and 0 <= w < num_nodes):
+                    raise KeyError('No such node ' + str(v) + " or " + str(w) + " in graph")
+                if c < 0:
+                    raise ValueError("Cost " + str(c) + " of edge (" + str(v) + ", " + str(w) + ") is negative")
+            chunk.sort(key=lambda e: e[0])
+            runs.append(_write_edge_run(chunk, directory))
+
+        # merges the runs in passes, MAX_RUNS at a time, until they can all be read at once
+        while len(runs) > MAX_RUNS:
+            merged = []
+            while runs:
+                group = runs[:MAX_RUNS]
+                merged.append(_write_edge_run(_merge_edge_runs(group), directory))
+                del runs[:MAX_RUNS]
+            runs = merged
+            merged = []
+
+        degrees = array('q', [0]) * num_nodes
+        num_edges = 0
+        offsets_start = HEADER.size
+        edges_start = offsets_start + 8 * (num_nodes + 1)
+        with open(path, 'wb') as f:
+            f.seek(edges_start)
+            buffer = []
+            for (v, w, c) in _merge_edge_runs(runs):
+                degrees[v] += 1
+                num_edges += 1
+                buffer.append(EDGE_RECORD.pack(v, w, c))
+                if len(buffer) == RUN_BUFFER_RECORDS:
+                    f.write(b''.join(buffer))
+                    buffer = []
+            f.write(b''.join(buffer))
+            runs = []
+
+            offsets = array('q', [0]) * (num_nodes + 1)
+            for v in range(num_nodes):
+                offsets[v + 1] = offsets[v] + degrees[v]
+            f.seek(0)
+            f.write(HEADER.pack(num_nodes, num_edges))
+            f.write(offsets.tobytes())
+    finally:
+        # removes the runs left behind if something went wrong
+        for run in runs + merged:
+            if os.path.exists(run):
+                os.remove(run)
+
+
+def write_graph_file(graph, path, memory_limit=DEFAULT_MEMORY_LIMIT, directory=None):
+    """
+    writes a Graph whose nodes are 0 to n - 1 to the file at path, so that it can be loaded as an
+    ExternalShortestPathGraph
+    """
+    edges = ((v, w, graph.get_edge_cost(v, w)) for v in graph.get_nodes() for w in graph.get_out_neighbours(v))
+    write_edge_file(path, graph.get_num_nodes(), edges, memory_limit, directory)
+
+
+class _SpillingQueue:
+    """
+    A priority queue of (distance, node) tuples holding at most capacity of them in memory. When the in-memory heap is
+    full, its larger half is sorted and written to a run on disk. The smallest item is the smaller of the heap's minimum
+    and the heads of the runs, which are kept in a second heap holding one item per run.
+    is_stale(distance, node) tells whether an item can no longer be useful, like an entry for an extracted node in
+    Dijkstra's Algorithm. Such items are dropped, instead of being written to disk again, whenever the heap is full and
+    whenever runs are merged. The runs are read and written buffer_records records at a time, so the buffers take
+    _run_buffer_memory(buffer_records) bytes on top of the heap.
+    """
+
+    def __init__(self, capacity, directory=None, is_stale=None, buffer_records=RUN_BUFFER_RECORDS):
+        self._capacity = capacity
+        self._directory = directory
+        self._is_stale = is_stale if is_stale is not None else lambda distance, node: False
+        self._buffer_records = buffer_records
+        self._heap = []
+        self._run_heads = []  # heap of (distance, node, run number) with the next item of each run
+        self._runs = dict()  # run number -> iterator over the rest of the run
+        self._run_sizes = dict()  # run number -> number of records written to the run
+        self._next_run = 0
+        self.num_spills = 0  # number of runs written to disk, for inspection
+        self.records_written = 0  # number of records written to the runs, including by merges, for inspection
+
+    def __len__(self):
+        return len(self._heap) + len(self._run_heads)
+
+    def push(self, item):
+        heapq.heappush(self._heap, item)
+        if len(self._heap) > self._capacity:
+            self._spill()
+
+    def pop(self):
+        if self._run_heads and (not self._heap or self._run_heads[0][:2] < self._heap[0]):
+            (d, v, run) = heapq.heappop(self._run_heads)
+            self._advance(run)
+            return d, v
+        return heapq.heappop(self._heap)
+
+    def _spill(self):
+        self._heap = [item for item in self._heap if not self._is_stale(*item)]
+        self._heap.sort()  # a sorted list is a valid heap
+        if len(self._heap) <= self._capacity // 2:
+            return  # dropping the stale items made enough room
+        half = len(self._heap) // 2
+        self._add_run(self._heap[half:])
+        del self._heap[half:]
+        self.num_spills += 1
+        if len(self._runs) > MAX_RUNS:
+            # merges the two smallest runs, and the next smallest ones as long as each is no larger than those taken
+            # so far together, up to MAX_RUNS of them. The runs other than the second are then at least doubled by the
+            # merge, so records are merged again a logarithmic number of times, instead of the large runs being
+            # written again every time a small one is added
+            by_size = sorted(self._runs, key=lambda run: self._run_sizes[run])
+            taken = 2
+            total = self._run_sizes[by_size[0]] + self._run_sizes[by_size[1]]
+            while taken < MAX_RUNS and self._run_sizes[by_size[taken]] <= total:
+                total += self._run_sizes[by_size[taken]]
+                taken += 1
+            merging = set(by_size[:taken])
+            runs = [heapq.merge([head[:2]], self._runs.pop(head[2])) for head in self._run_heads if head[2] in merging]
+            self._run_heads = [head for head in self._run_heads if head[2] not in merging]
+            heapq.heapify(self._run_heads)
+            for run in merging:
+                del self._run_sizes[run]
+            self._add_run(item for item in heapq.merge(*runs) if not self._is_stale(*item))
+
+    def _add_run(self, records):
+        """
+        writes the sorted records to a new run, and moves its first item into the run heads
+        """
+        (run, written) = _write_run(records, QUEUE_RECORD, self._directory, self._buffer_records)
+        self.records_written += written
+        self._runs[self._next_run] = _read_run(run, QUEUE_RECORD, self._buffer_records)
+        self._run_sizes[self._next_run] = written
+        self._advance(self._next_run)
+        self._next_run += 1
+
+    def _advance(self, run):
+        """
+        moves the next item of the run into the run heads, or forgets the run if it has no item left
+        """
+        item = next(self._runs[run], None)
+        if item is None:
+            del self._runs[run]
+            del self._run_sizes[run]
+        else:
+            heapq.heappush(self._run_heads, (item[0], item[1], run))
+
+    def close(self):
+        for records in self._runs.values():
+            records.close()  # closes the generator, and with it the run's file
+        self._runs = dict()
+        self._run_sizes = dict()
+        self._run_heads = []
+
+
+class ExternalShortestPathGraph:
+    def __init__(self, path, root, memory_limit=DEFAULT_MEMORY_LIMIT, directory=None):
+        """
+        opens the edge file at path, written by write_edge_file(), to compute the shortest paths from root.
+        memory_limit is the number of bytes the distance array, the edge offsets, the buffer of edges and the priority
+        queue may use together. Of the part left after the distance array and offsets, the buffer takes at most half,
+        and never more than RUN_BUFFER_RECORDS edges. The rest goes to the priority queue: at most half of it to the
+        buffers of the runs the queue spills to temporary files in directory when full, and the remainder to the
+        in-memory heap.
+        A ValueError is raised if memory_limit does not even leave room for a few queue entries.
+        """
+        self._path = path
+        self._root = root
+        self._directory = directory
+        with open(path, 'rb') as f:
+            (self._num_nodes, self._num_edges) = HEADER.unpack(f.read(HEADER.size))
+            self._offsets = array('q')
+            self._offsets.frombytes(f.read(8 * (self._num_nodes + 1)))
+        self._edges_start = HEADER.size + 8 * (self._num_nodes + 1)
+        if not 0 <= root < self._num_nodes:
+            raise KeyError("No such node (" + str(root) + ") in graph")
+
+        if memory_limit < min_memory_limit(self._num_nodes):
+            raise ValueError("memory_limit of " + str(memory_limit) + " bytes is too small, at least " +
+                             str(min_memory_limit(self._num_nodes)) + " bytes are needed for " +
+                             str(self._num_nodes) + " nodes")
+        remaining = memory_limit - _fixed_memory(self._num_nodes)
+        self._buffer_records = min(remaining // 2 // EDGE_RECORD.size, RUN_BUFFER_RECORDS)
+        queue_memory = remaining - self._buffer_records * EDGE_RECORD.size
+        self._run_buffer_records = min(queue_memory // 2 // _run_buffer_memory(1), RUN_BUFFER_RECORDS)
+        self._queue_capacity = (queue_memory - _run_buffer_memory(self._run_buffer_records)) // HEAP_ENTRY_SIZE
+
+        self._dijkstra_computed = False
+        self._d_dist = None
+        self.num_spills = 0  # number of runs the priority queue wrote to disk during the last run
+        self.bytes_read = 0  # number of bytes of edges read from the edge file during the last run
+
+    def get_root(self):
+        return self._root
+
+    def get_num_nodes(self):
+        return self._num_nodes
+
+    def get_num_edges(self):
+        return self._num_edges
+
+    def _dijkstra(self):
+        """
+        The same Dijkstra's Algorithm as ShortestPathGraph._dijkstra(), with the distances in a typed array and the
+        priority queue in a _SpillingQueue.
+        The outgoing edges of an extracted node are read by self._out_edges().
+        """
+        self._dijkstra_computed = True
+        dist = array('q', [INT64_MAX]) * self._num_nodes
+        extracted = bytearray(self._num_nodes)
+        dist[self._root] = 0
+        queue = _SpillingQueue(self._queue_capacity, self._directory, lambda d, v: extracted[v] or d != dist[v],
+                               self._run_buffer_records)
+        queue.push((0, self._root))
+        self.bytes_read = 0
+        try:
+            with open(self._path, 'rb') as f:
+                while len(queue):
+                    (d_v, v) = queue.pop()
+                    if d_v != dist[v] or extracted[v]:
+                        continue
+                    extracted[v] = 1
+                    for (w, c) in self._out_edges(f, v):
+                        new_distance = d_v + c
+                        if new_distance < dist[w]:
+                            dist[w] = new_distance
+                            queue.push((new_distance, w))
+        finally:
+            queue.close()
+        self._d_dist = dist
+        self.num_spills = queue.num_spills
+
+    def _out_edges(self, f, v):
+        """
+        yields the (target node, cost) tuples of the outgoing edges of v, read from the edge file f.
+        Only v's own edges are read, at most self._buffer_records of them at a time. Dijkstra extracts every node once,
+        in order of distance rather than of position in the file, so reading past v's edges, or keeping them once they
+        have been used, would mostly cost I/O and memory for edges that are not needed again.
+        """
+        first, last = self._offsets[v], self._offsets[v + 1]
+        for start in range(first, last, self._buffer_records):
+            f.seek(self._edges_start + start * EDGE_RECORD.size)
+            buffer = f.read(min(last - start, self._buffer_records) * EDGE_RECORD.size)
+            self.bytes_read += len(buffer)
+            for (_, w, c) in EDGE_RECORD.iter_unpack(buffer):
+                yield w, c
+
+    def dijkstra_get_dist(self, node, numerical=False):
+        """
+        returns the value dist(root, node), in the same form as ShortestPathGraph.dijkstra_get_dist()
+        """
+        if not self._dijkstra_computed:
+            self._dijkstra()
+        if not 0 <= node < self._num_nodes:
+            raise KeyError("No such node (" + str(node) + ") in graph")
+        dist = self._d_dist[node]
+        if dist == INT64_MAX and not numerical:
+            return "There is no path from " + str(self._root) + " to " + str(node) + "."
+        elif numerical:
+            return INF if dist == INT64_MAX else dist
+        else:
+            return "Distance from " + str(self._root) + " to " + str(node) + " is " + str(dist)
@@ -5,10 +5,37 @@ and access the shortest distance as well as shortest distance trees.
 Authors: Qi Ying Lim, Jiacheng Xu
 """
 
+from array import array
 from collections import defaultdict
+from itertools import count, islice
+from numbers import Integral
 import heapq
 
 INF = 9999  # infinity
+INT32_MAX = 2 ** 31 - 1  # largest value of a 32-bit typed array, used as the sentinel for unreachable nodes
+INT64_MAX = 2 ** 63 - 1  # largest value of a 64-bit typed array, used as the sentinel for unreachable nodes
+HILBERT_SIDE = 2 ** 16  # node coordinates are rounded to a grid of this side before computing their Hilbert index
+
+
+def _hilbert_index(x, y, side):
+    """
+    returns the position of the grid point (x, y) along the Hilbert curve filling a side * side grid, where side is a
+    power of 2. Points that are close on the grid tend to be close along the curve.
+    """
+    d = 0
+    s = side // 2
+    while s > 0:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        d += s * s * ((3 * rx) ^ ry)
+        # rotates the quadrant, so that the curve inside it has the right orientation
+        if ry == 0:
+            if rx == 1:
+                x = side - 1 - x
+                y = side - 1 - y
+            x, y = y, x
+        s //= 2
+    return d
 
 
 class Graph:
@@ -44,17 +71,15 @@ class Graph:
         Edges are input as a list of tuples, (v,w,c) where v,w are Nodes and c is the cost of the edge
         """
         for (v, w, c) in edge_list:
-            if v in self.get_nodes() and w in self.get_nodes():
+            if self.in_graph(v) and self.in_graph(w):
                 self._graph[v].add(w)
-
-                if w in set(self._graph.keys()):
-                    self._inEdges[w].add(v)
-                else:
-                    self._inEdges[w] = set()
-                    self._inEdges[w].add(v)
+                self._inEdges[w].add(v)
 
                 # uses the edge with the smaller weight, if there are parallel edges
-                self._cost[(v, w)] = min(c, self._cost[(v, w)])
+                if (v, w) in self._cost:
+                    self._cost[(v, w)] = min(c, self._cost[(v, w)])
+                else:
+                    self._cost[(v, w)] = c
             else:
                 raise KeyError('No such node ' + str(v) + " or " + str(w) + " in graph")
 
@@ -67,7 +92,7 @@ class Graph:
         :return: a list of the outgoing neighbours from the node
         """
         if k == 0:
-            if node in self.get_nodes():
+            if self.in_graph(node):
                 return self._graph[node]
             else:
                 raise KeyError("No such node (" + str(node) + ") in graph")
@@ -75,16 +100,17 @@ class Graph:
             return
 
     def get_in_neighbours(self, node):
-        if node in self.get_nodes():
+        if self.in_graph(node):
             return self._inEdges[node]
         else:
             raise KeyError("No such node (" + str(node) + ") in graph")
 
     def in_graph(self, node):
-        return node in self.get_nodes()
+        # checks the dictionary directly, since building the node set would make every lookup O(n)
+        return node in self._graph
 
     def get_num_nodes(self):
-        return len(self.get_nodes())
+        return len(self._graph)
 
     def get_num_edges(self):
         return len(self._cost)
@@ -94,44 +120,256 @@ class Graph:
 
 
 class ShortestPathGraph(Graph):
-    def __init__(self, root):
+    def __init__(self, root, integer_weights=False):
+        """
+        creates a graph whose shortest paths are computed from root.
+        If integer_weights is True, every edge cost must be an integer (including numpy integers), and the edge costs,
+        distances and shortest path trees are stored in fixed-width typed arrays (see self._build_int_arrays()) instead
+        of dictionaries, with the largest value of the array type marking the unreachable nodes. Only the costs of the
+        edges added since the arrays were last built are held in the dictionary of costs.
+        """
         Graph.__init__(self)
         self._root = root
-        self.set_nodes([root])
+        self._integer_weights = integer_weights
         self._dijkstra_computed = False  # prevents unnecessary re-computation of distances
         self._bellman_ford_computed = False
-        # stores distances from root as returned by the dijkstra algorithm
-        self._d_dist = defaultdict(lambda: INF)
+        # stores distances from root as returned by the dijkstra algorithm. In the integer-weight mode, this and the
+        # three dictionaries below are None, since the typed arrays further down hold the distances and parent nodes
+        self._d_dist = None
         # stores distances from root as returned by the bellman-ford algorithm
-        self._bf_dist = defaultdict(lambda: INF)
+        self._bf_dist = None
         # stores the parent nodes of each node in the shortest path Dijkstra tree
-        self._d_prev = defaultdict()
-        self._d_prev[root] = None
+        self._d_prev = None
         # stores the parent nodes of each node in the shortest path BF tree
-        self._bf_prev = defaultdict()
-        self._bf_prev[root] = None
+        self._bf_prev = None
+        # the node returned by the bellman-ford algorithm if it finds a negative cycle, None otherwise
+        self._bf_cycle_node = None
         # time it took to run Dijkstra algorithm on this graph
         self._d_time = 0
+        # structure of the graph, as computed by self._preprocess()
+        self._preprocessed = False
+        self._reachable = set()  # nodes reachable from the root
+        self._components = []  # strongly connected components of the reachable subgraph, in topological order
+        self._is_dag = False  # True if the reachable subgraph has no cycles
+        self._cyclic_nodes = []  # nodes in components that can contain a negative cycle
+        self._negative_edges = False  # True if some edge between reachable nodes has a negative cost
+        # the method and node coordinates given to self.reorder_nodes(), None keeps the topological order
+        self._reorder_method = None
+        self._coordinates = None
+        # typed array storage of the graph, as built by self._build_int_arrays(). The reachable nodes are numbered
+        # first, and the arrays are kept when the graph changes, since they hold the costs of the edges added before
+        self._int_built = False  # True if the arrays are up to date with the graph
+        self._int_nodes = None  # the nodes; node self._int_nodes[i] is numbered i in the arrays below
+        self._int_num_reachable = None  # the reachable nodes are numbered 0 to self._int_num_reachable - 1
+        self._int_index = None  # maps each reachable node to its number
+        self._int_offsets = None  # the outgoing edges of node i are numbered self._int_offsets[i] to [i + 1] - 1
+        self._int_targets = None  # the number of the node each edge goes to
+        self._int_weights = None  # the cost of each edge
+        self._int_topo = None  # the node numbers, in topological order of their components
+        self._int_typecode = None  # 'i' (32 bits) or 'q' (64 bits), the type of the weights and distances
+        self._int_sentinel = None  # the distance of the unreachable nodes
+        self._int_bound = None  # no stored distance costs more than this, or less than its negative
+        # distances and parent node numbers as computed in the integer-weight mode, -1 marks the nodes without a parent
+        self._int_d_dist = None
+        self._int_d_prev = None
+        self._int_bf_dist = None
+        self._int_bf_prev = None
+        self.set_nodes([root])
 
     def get_root(self):
         return self._root
 
+    def set_nodes(self, nodes):
+        """
+        adds a list of Nodes specified by the input list nodes, and discards the computed distances and structure
+        """
+        Graph.set_nodes(self, nodes)
+        self._clear_computed()
+
+    def set_edges(self, edge_list):
+        """
+        Edges are input as a list of tuples, (v,w,c) where v,w are Nodes and c is the cost of the edge. The computed
+        distances and structure are discarded, since the new edges can change them
+        """
+        if self._integer_weights:
+            edge_list = self._with_stored_costs(edge_list)
+        Graph.set_edges(self, edge_list)
+        self._clear_computed()
+
+    def _with_stored_costs(self, edge_list):
+        """
+        yields the edges of edge_list, after copying the cost stored in the typed arrays of each edge that is already in
+        the graph to the dictionary of costs, so that Graph.set_edges() keeps the smaller cost of parallel edges
+        """
+        for (v, w, c) in edge_list:
+            if (v, w) not in self._cost:
+                stored = self._stored_costs(v).get(w)
+                if stored is not None:
+                    self._cost[(v, w)] = stored
+            yield v, w, c
+
+    def get_edge_cost(self, u, v):
+        """
+        returns the cost of the edge (u, v). In the integer-weight mode, the cost is looked up in the typed arrays,
+        unless the edge was added since they were built, and float('inf') is returned if there is no such edge
+        """
+        if not self._integer_weights:
+            return Graph.get_edge_cost(self, u, v)
+        if (u, v) in self._cost:
+            return self._cost[(u, v)]
+        return self._stored_costs(u).get(v, float('inf'))
+
+    def get_num_edges(self):
+        if self._integer_weights:
+            return sum(len(neighbours) for neighbours in self._graph.values())
+        return Graph.get_num_edges(self)
+
+    def _stored_costs(self, v):
+        """
+        returns a dictionary mapping each neighbour w of v to the cost of (v, w) stored in the typed arrays of the
+        integer-weight mode, which is empty if v is not in the arrays
+        """
+        i = self._int_index.get(v) if self._int_index is not None else None
+        if i is None:
+            return {}
+        nodes, targets, weights = self._int_nodes, self._int_targets, self._int_weights
+        return {nodes[targets[e]]: weights[e] for e in range(self._int_offsets[i], self._int_offsets[i + 1])}
+
+    def _out_edges(self, v):
+        """
+        returns the (neighbour, cost) tuples of the outgoing edges of v. In the integer-weight mode, they are read from
+        the typed arrays when these are up to date
+        """
+        if not self._integer_weights:
+            return [(w, self._cost[(v, w)]) for w in self._graph[v]]
+        if self._int_built:
+            i = self._int_index[v]
+            nodes, targets, weights = self._int_nodes, self._int_targets, self._int_weights
+            return [(nodes[targets[e]], weights[e]) for e in range(self._int_offsets[i], self._int_offsets[i + 1])]
+        stored = self._stored_costs(v)
+        return [(w, self._cost[(v, w)] if (v, w) in self._cost else stored[w]) for w in self._graph[v]]
+
+    def _clear_computed(self):
+        """
+        forgets everything computed from the edges of the graph, so that it is computed again when it is next needed
+        """
+        self._dijkstra_computed = False
+        self._bellman_ford_computed = False
+        if not self._integer_weights:
+            self._d_dist = defaultdict(lambda: INF)
+            self._bf_dist = defaultdict(lambda: INF)
+            self._d_prev = defaultdict()
+            self._d_prev[self._root] = None
+            self._bf_prev = defaultdict()
+            self._bf_prev[self._root] = None
+        self._bf_cycle_node = None
+        self._preprocessed = False
+        self._int_built = False
+
+    def _preprocess(self):
+        """
+        Looks at the structure of the graph before any shortest path algorithm is run on it.
+        We use Tarjan's algorithm, starting from the root, to find the strongly connected components. Since the search
+        starts from the root, the nodes it visits are exactly the nodes reachable from the root, so the same pass also
+        prunes the unreachable nodes. Tarjan's algorithm finds the components in reverse topological order.
+        From the components, we find whether the reachable subgraph is a DAG (every component is a single node without
+        a self-loop), and which nodes lie in a component holding a negative edge. A negative cycle lies entirely inside
+        one component, so only those nodes need to be checked for one.
+        The search is iterative, so that long paths do not hit python's recursion limit.
+        """
+        if self._preprocessed:
+            return
+        self._preprocessed = True
+        index = {self._root: 0}  # order in which nodes are visited
+        low = {self._root: 0}  # smallest index reachable from the node through its subtree and one back edge
+        stack = [self._root]
+        on_stack = {self._root}
+        components = []
+        work = [(self._root, iter(self.get_out_neighbours(self._root)))]
+        while work:
+            (v, neighbours) = work[-1]
+            for w in neighbours:
+                if w not in index:
+                    index[w] = low[w] = len(index)
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(self.get_out_neighbours(w))))
+                    break
+                elif w in on_stack:
+                    low[v] = min(low[v], index[w])
+            else:
+                # all the neighbours of v have been visited
+                work.pop()
+                if work:
+                    u = work[-1][0]
+                    low[u] = min(low[u], low[v])
+                if low[v] == index[v]:  # v is the root of a component
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack.remove(w)
+                        component.append(w)
+                        if w == v:
+                            break
+                    components.append(component)
+        components.reverse()
+
+        self._reachable = set(index.keys())
+        self._components = components
+        self._is_dag = True
+        self._cyclic_nodes = []
+        self._negative_edges = any(c < 0 for v in self._reachable for (w, c) in self._out_edges(v))
+        for component in components:
+            members = set(component)
+            if len(component) > 1 or component[0] in self.get_out_neighbours(component[0]):
+                self._is_dag = False
+                if any(c < 0 for v in component for (w, c) in self._out_edges(v) if w in members):
+                    self._cyclic_nodes.extend(component)
+
+    def _dag_shortest_paths(self, dist, prev):
+        """
+        Computes the shortest distances from the root when the reachable subgraph is a DAG, by relaxing the outgoing
+        edges of every node once, in topological order. This runs in O(n + m) and handles negative edges.
+        The distances and parent nodes are written into dist and prev.
+        """
+        dist[self._root] = 0
+        for component in self._components:
+            v = component[0]
+            for neighbour in self.get_out_neighbours(v):
+                new_distance = dist[v] + self._cost[(v, neighbour)]
+                if new_distance < dist[neighbour]:
+                    dist[neighbour] = new_distance
+                    prev[neighbour] = v
+
     def _dijkstra(self):
         """
         An implementation of the Dijkstra's Algorithm, as taken from the pseudocode from class notes.
         Since python's heapq does not have an easily-accessible decreaseKey() function, we worked around this by
         maintaining the self._d_dist array to hold the 'correct', up-to-date distance. When we extract the minimum key
-        from the heap, we first verify if this item represents the correct distance as in Line 93, before continuing as
-        the pseudo-code describes.
+        from the heap, we first verify if this item represents the correct distance, before continuing as the
+        pseudo-code describes.
+        The priority queue starts with only the root, and nodes are pushed when they are first reached, so unreachable
+        nodes never enter it. If the reachable subgraph is a DAG, a single pass in topological order is used instead.
         """
         self._dijkstra_computed = True
+        self._preprocess()
+        if self._integer_weights:
+            self._dijkstra_int()
+            return
+        if self._is_dag:
+            self._dag_shortest_paths(self._d_dist, self._d_prev)
+            return
         # making the priority queue
-        d = [(INF, node) if node != self._root else (0, node) for node in self.get_nodes()]
+        d = [(0, self._root)]
         self._d_dist[self._root] = 0  # setting the distance of the root to self as 0
-        # loop through all the vertices
-        for i in range(len(self.get_nodes())):
+        # every vertex is extracted at most once, so that negative edges cannot make the loop run forever
+        extracted = set()
+        # loop until every reachable vertex has been extracted
+        while d:
             (d_v, v) = heapq.heappop(d)  # extract the vertex with the minimum distance to the root
-            if d_v == self._d_dist[v]:  # verifies that the popped item correctly contains the minimum distance
+            # verifies that the popped item correctly contains the minimum distance
+            if d_v == self._d_dist[v] and v not in extracted:
+                extracted.add(v)
                 for neighbour in self.get_out_neighbours(v):
                     new_distance = self._d_dist[v] + self._cost[(v, neighbour)]
                     if new_distance < self._d_dist[neighbour]:
@@ -143,16 +381,20 @@ class ShortestPathGraph(Graph):
 
     def dijkstra_get_dist(self, node, numerical=False):
         """
-        returns the value dist(root, node)
+        returns the value dist(root, node). If numerical is True and there is no path, INF is returned, or float('inf')
+        in the integer-weight mode, where a path can cost INF or more
         """
         if not self._dijkstra_computed:
             self._dijkstra()
-        if self._d_dist[node] == INF and not numerical:
+        dist = self._dijkstra_dist(node)
+        if dist is None and not numerical:
             return "There is no path from " + str(self._root) + " to " + str(node) + "."
         elif numerical:
-            return self._d_dist[node]
+            if dist is None:
+                return float('inf') if self._integer_weights else INF
+            return dist
         else:
-            return "Distance from " + str(self._root) + " to " + str(node) + " is " + str(self._d_dist[node])
+            return "Distance from " + str(self._root) + " to " + str(node) + " is " + str(dist)
 
     def dijkstra_get_path(self, node):
         """
@@ -160,14 +402,14 @@ class ShortestPathGraph(Graph):
         """
         if not self._dijkstra_computed:
             self._dijkstra()
-        if self._d_dist[node] == INF:
+        if self._dijkstra_dist(node) is None:
             return "There is no path from " + str(self._root) + " to " + str(node) + "."
         else:
             v = node
             path = [node]
-            while self._d_prev[v] is not None:
-                path.append(self._d_prev[v])
-                v = self._d_prev[v]
+            while self._dijkstra_parent(v) is not None:
+                v = self._dijkstra_parent(v)
+                path.append(v)
             path.reverse()
             return path
 
@@ -177,76 +419,224 @@ class ShortestPathGraph(Graph):
         """
         if not self._dijkstra_computed:
             self._dijkstra()
+        if self._integer_weights:
+            return self._int_tree(self._int_d_prev)
         return list(map(lambda x: (x[1], x[0]), self._d_prev.items()))
 
+    def _dijkstra_dist(self, node):
+        """
+        returns dist(root, node) as computed by Dijkstra, or None if there is no path from root to node
+        """
+        if self._integer_weights:
+            return self._int_value(self._int_d_dist, node)
+        dist = self._d_dist.get(node, INF)
+        return None if dist == INF else dist
+
+    def _dijkstra_parent(self, node):
+        """
+        returns the parent of node in the Dijkstra tree, or None for the root
+        """
+        if self._integer_weights:
+            return self._int_parent(self._int_d_prev, node)
+        return self._d_prev[node]
+
+    def _reverse_dijkstra(self, target):
+        """
+        runs Dijkstra backwards from target along the incoming edges, and returns a dictionary holding dist(v, target)
+        for every node v that can reach target. Nodes that cannot reach target are left out of the dictionary.
+        """
+        dist = {target: 0}
+        heap = [(0, target)]
+        while heap:
+            (d_v, v) = heapq.heappop(heap)
+            if d_v == dist[v]:
+                for neighbour in self.get_in_neighbours(v):
+                    new_distance = d_v + self.get_edge_cost(neighbour, v)
+                    if neighbour not in dist or new_distance < dist[neighbour]:
+                        dist[neighbour] = new_distance
+                        heapq.heappush(heap, (new_distance, neighbour))
+        return dist
+
+    def _spur_search(self, spur, target, to_target, removed_nodes, removed_edges):
+        """
+        finds the shortest path from spur to target that avoids removed_nodes and removed_edges, and returns it as a
+        (path, cost) tuple, or None if there is no such path.
+        The search is an A* search guided by to_target, the distances to target in the full graph. Removing nodes and
+        edges can only make paths longer, so these distances never overestimate, and we can stop as soon as the target
+        is popped from the heap instead of settling the whole graph.
+        """
+        dist = {spur: 0}
+        prev = {spur: None}
+        heap = [(to_target[spur], 0, spur)]
+        while heap:
+            (_, d_v, v) = heapq.heappop(heap)
+            if v == target:
+                path = [v]
+                while prev[v] is not None:
+                    v = prev[v]
+                    path.append(v)
+                path.reverse()
+                return path, d_v
+            if d_v == dist[v]:
+                for (neighbour, cost) in self._out_edges(v):
+                    # nodes that cannot reach the target are never worth expanding
+                    if neighbour in removed_nodes or neighbour not in to_target or (v, neighbour) in removed_edges:
+                        continue
+                    new_distance = d_v + cost
+                    if neighbour not in dist or new_distance < dist[neighbour]:
+                        dist[neighbour] = new_distance
+                        prev[neighbour] = v
+                        heapq.heappush(heap, (new_distance + to_target[neighbour], new_distance, neighbour))
+        return None
+
+    def _dijkstra_iter_paths(self, node):
+        """
+        An implementation of Yen's algorithm for the k shortest simple paths, written as a generator so that the paths
+        are produced lazily, one at a time, in order of increasing cost.
+        The first path is read off the Dijkstra tree. Every following path is found by taking each prefix (root path) of
+        the previously accepted path, removing the edges already used by accepted paths sharing that prefix, and running
+        a spur search from the last node of the prefix. The spur searches reuse the reverse distances to node, so each
+        of them stops as soon as it reaches node.
+        """
+        if not self._dijkstra_computed:
+            self._dijkstra()
+        if self._dijkstra_dist(node) is None:
+            return
+        to_target = self._reverse_dijkstra(node)
+        accepted = [self.dijkstra_get_path(node)]
+        yield accepted[0], self._dijkstra_dist(node)
+
+        candidates = []  # heap of (cost, tie-breaker, path) of paths that are yet to be accepted
+        seen = {tuple(accepted[0])}
+        tie_breaker = count()
+        while True:
+            last_path = accepted[-1]
+            root_cost = 0
+            for i in range(len(last_path) - 1):
+                spur = last_path[i]
+                root_path = last_path[:i + 1]
+                removed_edges = {(path[i], path[i + 1]) for path in accepted if path[:i + 1] == root_path}
+                removed_nodes = set(root_path[:-1])  # keeps the resulting paths simple
+                spur_result = self._spur_search(spur, node, to_target, removed_nodes, removed_edges)
+                if spur_result is not None:
+                    (spur_path, spur_cost) = spur_result
+                    path = root_path[:-1] + spur_path
+                    if tuple(path) not in seen:
+                        seen.add(tuple(path))
+                        heapq.heappush(candidates, (root_cost + spur_cost, next(tie_breaker), path))
+                root_cost += self.get_edge_cost(spur, last_path[i + 1])
+            if not candidates:
+                return
+            (cost, _, path) = heapq.heappop(candidates)
+            accepted.append(path)
+            yield path, cost
+
+    def dijkstra_get_k_paths(self, node, k, lazy=False):
+        """
+        returns the k shortest simple paths from root to node as a list of (path, cost) tuples, sorted by cost.
+        Fewer than k paths are returned if the graph does not have that many, and an empty list if node is not
+        reachable. Like Dijkstra itself, this requires the edge costs to be non-negative.
+        If lazy is True, a generator is returned instead, which only computes the next path when it is asked for. k can
+        then be None to go through all the simple paths.
+        A ValueError is raised if some edge reachable from the root has a negative cost, since the spur searches would
+        then stop before finding the shortest spur paths.
+        """
+        self._preprocess()
+        if self._negative_edges:
+            raise ValueError("The k shortest paths need non-negative edge costs")
+        paths = self._dijkstra_iter_paths(node)
+        if lazy:
+            return islice(paths, k)
+        return list(islice(paths, k))
+
     def _bellmanford(self):
         """
         This is the implementation of bellman_ford algorithm we learned during the class. 
         I used 2d array of the pseudo-code. 
+        The graph is preprocessed first: only the nodes reachable from the root are swept in each round, and the
+        number of rounds is the number of reachable nodes minus one. The extra round checking for a negative cycle
+        only looks at the nodes in components that can contain one. If the reachable subgraph is a DAG, a single pass
+        in topological order is used instead.
         """
         n = len(self.get_nodes())
         self._bellman_ford_computed = True
-        d = [[INF] * n for _ in range(n)]
+        self._preprocess()
+        if self._integer_weights:
+            cycle_node = self._bellmanford_int()
+            return n + 1 if cycle_node is None else cycle_node
+        if self._is_dag:
+            self._dag_shortest_paths(self._bf_dist, self._bf_prev)
+            return n + 1
+
+        nodes = [v for component in self._components for v in component]
+        r = len(nodes)
+        d = {i: [INF] * r for i in nodes}
         d[self._root][0] = 0
 
-        for k in range(1, n):
-            for i in range(n):  # go through all nodes
+        for k in range(1, r):
+            for i in nodes:  # go through all reachable nodes
                 d[i][k] = d[i][k - 1]
                 for u in self.get_in_neighbours(i):
-                    if d[i][k] > d[u][k - 1] + self._cost[(u, i)]:  
+                    if u in d and d[i][k] > d[u][k - 1] + self._cost[(u, i)]:
                         d[i][k] = d[u][k - 1] + self._cost[(u, i)]  # modify the current distance
                         self._bf_prev[i] = u  # switch the parent node
 
         # (One more iteration to check the negative cycle)
-        for i in range(n):
+        for i in self._cyclic_nodes:
             for u in self.get_in_neighbours(i):
-                if d[i][n - 1] > d[u][n - 1] + self._cost[(u, i)]:
+                if u in d and d[i][r - 1] > d[u][r - 1] + self._cost[(u, i)]:
                     # print("Negative Cycle")
+                    self._bf_cycle_node = i
                     return i
 
         # Assign final distance to each node
-        for node in self.get_nodes():
-            self._bf_dist[node] = d[node][n - 1]
+        for node in nodes:
+            self._bf_dist[node] = d[node][r - 1]
         return n + 1
 
     def bellmanford_get_dist(self, node):
-        result = 0
+        """
+        returns (dist(root, node), dist(root, node)), (INF, INF) if there is no path, or (v, -INF) if v is affected by a
+        negative cycle. In the integer-weight mode, where a path can cost INF or more, float('inf') and float('-inf')
+        are used instead of INF and -INF
+        """
         if not self._bellman_ford_computed:
-            result = self._bellmanford()
+            self._bellmanford()
+        infinity = float('inf') if self._integer_weights else INF
 
         # if negative cycle detcted
-        if result != len(self.get_nodes()) + 1:
+        if self._bf_cycle_node is not None:
             #print('neg cycle detected')
-            return (result,-INF)
+            return (self._bf_cycle_node,-infinity)
 
         # if there is no path from root to node
-        if self._bf_dist[node] > (INF-10):
+        dist = self._bellmanford_dist(node)
+        if dist is None:
             #print('there is no path ')
-            return (INF,INF)
+            return (infinity,infinity)
         else:
-            #print('there is a path of length ' + str(self._bf_dist[node]))
-            # return "Distance from " + str(self._root) + " to " + str(node) + " is " + str(self._bf_dist[node])
-            return  (self._bf_dist[node],self._bf_dist[node])
+            #print('there is a path of length ' + str(dist))
+            # return "Distance from " + str(self._root) + " to " + str(node) + " is " + str(dist)
+            return  (dist,dist)
 
     def bellmanford_get_path(self, node):
         """
         returns the shortest path from node to root
         """
-        result = 0
         if not self._bellman_ford_computed:
             #print("Running Bellman-Ford Algorithm")
-            result = self._bellmanford()
-        if self._bellmanford() != len(self.get_nodes()) + 1:
+            self._bellmanford()
+        if self._bf_cycle_node is not None:
             return "Negative cycle"
 
-        if self._bf_dist[node] > (INF - 10):
+        if self._bellmanford_dist(node) is None:
             return "There is no path from " + str(self._root) + " to " + str(node) + "."
         else:
             v = node
             path = [node]
-            while self._bf_prev[v] is not None:
-                path.append(self._bf_prev[v])
-                v = self._bf_prev[v]
+            while self._bellmanford_parent(v) is not None:
+                v = self._bellmanford_parent(v)
+                path.append(v)
             path.reverse()
             return path
 
@@ -257,4 +647,331 @@ class ShortestPathGraph(Graph):
         if not self._bellman_ford_computed:
             print("Running Bellman-Ford Algorithm")
             self._bellmanford()
+        if self._integer_weights:
+            return self._int_tree(self._int_bf_prev)
         return list(map(lambda x: (x[1], x[0]), self._bf_prev.items()))
+
+    def _bellmanford_dist(self, node):
+        """
+        returns dist(root, node) as computed by Bellman-Ford, or None if there is no path from root to node
+        """
+        if self._integer_weights:
+            return self._int_value(self._int_bf_dist, node)
+        dist = self._bf_dist.get(node, INF)
+        return None if dist > (INF - 10) else dist
+
+    def _bellmanford_parent(self, node):
+        """
+        returns the parent of node in the Bellman-Ford tree, or None for the root
+        """
+        if self._integer_weights:
+            return self._int_parent(self._int_bf_prev, node)
+        return self._bf_prev[node]
+
+    def _build_int_arrays(self):
+        """
+        Stores the graph in typed arrays for the integer-weight mode, in the compressed sparse row layout: the nodes are
+        numbered from 0, the reachable ones first, and the outgoing edges of each node are stored next to each other, so
+        that the relaxation loops read them from consecutive memory instead of going through a set and a dictionary per
+        edge. The costs come from the dictionary of costs for the edges added since the arrays were last built, and
+        from the previous arrays otherwise, and the dictionary is emptied once they are all in the new arrays.
+        The weights and distances are stored in 32 bits when no path of as many edges as there are reachable nodes can
+        cost more than the largest 32-bit value, and in 64 bits otherwise. An OverflowError is raised if even 64 bits
+        are not enough, and a TypeError if some cost is not an integer.
+        """
+        if self._int_built:
+            return
+        self._preprocess()
+        topological = [v for component in self._components for v in component]
+        reachable = self._node_order() if self._reorder_method is not None else topological
+        nodes = reachable + [v for v in self._graph if v not in self._reachable]
+        index = {v: i for (i, v) in enumerate(nodes)}
+        targets = []
+        costs = []
+        offsets = [0]
+        for v in nodes:
+            for (neighbour, cost) in self._out_edges(v):
+                if not isinstance(cost, Integral):
+                    raise TypeError("Cost " + str(cost) + " of edge (" + str(v) + ", " + str(neighbour) +
+                                    ") is not an integer")
+                targets.append(index[neighbour])
+                costs.append(int(cost))
+            offsets.append(len(targets))
+
+        # a simple path has at most len(reachable) - 1 edges. Dijkstra with negative edges can also store the cost of a
+        # simple path followed by one more edge, back to an extracted node, so the bound allows len(reachable) edges.
+        # The edges of the reachable nodes come first, and the neighbours of a reachable node are reachable as well
+        reachable_edges = offsets[len(reachable)]
+        bound = max([abs(c) for c in costs[:reachable_edges]], default=0) * max(len(reachable), 1)
+        largest = max([bound] + [abs(c) for c in costs[reachable_edges:]])
+        if largest < INT32_MAX:
+            typecode, sentinel = 'i', INT32_MAX
+        elif largest < INT64_MAX:
+            typecode, sentinel = 'q', INT64_MAX
+        else:
+            raise OverflowError("Path costs of up to " + str(largest) + " do not fit in 64 bits")
+        index_typecode = 'i' if len(targets) < INT32_MAX else 'q'
+
+        self._int_built = True
+        self._int_nodes = nodes
+        self._int_num_reachable = len(reachable)
+        self._int_index = index
+        self._int_offsets = array(index_typecode, offsets)
+        self._int_targets = array(index_typecode, targets)
+        self._int_weights = array(typecode, costs)
+        self._cost = defaultdict(lambda: INF)
+        # inside a component any order works, so the nodes follow the order they are stored in
+        self._int_topo = array(index_typecode, [i for component in self._components
+                                                for i in sorted(index[v] for v in component)])
+        self._int_typecode = typecode
+        self._int_sentinel = sentinel
+        self._int_bound = bound
+
+    def reorder_nodes(self, method='rcm', coordinates=None):
+        """
+        Changes the order in which the nodes are stored in the typed arrays of the integer-weight mode, so that nodes
+        joined by an edge are stored close to each other. The relaxation loops then read distances from nearby memory
+        instead of jumping through the whole array. The results are still returned for the original nodes.
+        method can be:
+            'topological': the default order, where the nodes follow the topological order of their components
+            'input': the order in which the nodes were added to the graph, as they come from upstream. This does not
+                improve locality, and is meant for comparing the other orders against
+            'bfs': the order in which a breadth-first search from the root visits the nodes
+            'rcm': the reverse Cuthill-McKee order, which keeps the numbers of neighbouring nodes close together
+            'hilbert': the order of the nodes along a Hilbert curve, where coordinates is a dictionary mapping each node
+                to its (x, y) position. This suits graphs whose edges join nodes that are close in space, like road maps
+        The distances are computed again, with the new order, the next time they are asked for.
+        """
+        if not self._integer_weights:
+            raise ValueError("Node reordering only applies to graphs with integer_weights=True")
+        if method not in ('topological', 'input', 'bfs', 'rcm', 'hilbert'):
+            raise ValueError("Unknown reordering method " + str(method))
+        if method == 'hilbert' and coordinates is None:
+            raise ValueError("The hilbert reordering needs the coordinates of the nodes")
+        self._reorder_method = method if method != 'topological' else None
+        self._coordinates = coordinates
+        self._int_built = False
+        self._dijkstra_computed = False
+        self._bellman_ford_computed = False
+        self._bf_cycle_node = None
+
+    def get_edge_span(self):
+        """
+        returns the average, over all edges between reachable nodes, of the distance between the positions of their two
+        nodes in the typed arrays of the integer-weight mode. The smaller it is, the closer together the relaxation
+        loops read and write the distances.
+        """
+        if not self._integer_weights:
+            raise ValueError("The edge span only applies to graphs with integer_weights=True")
+        self._build_int_arrays()
+        offsets, targets = self._int_offsets, self._int_targets
+        r = self._int_num_reachable
+        if offsets[r] == 0:
+            return 0
+        span = sum(abs(targets[e] - v) for v in range(r) for e in range(offsets[v], offsets[v + 1]))
+        return span / offsets[r]
+
+    def _node_order(self):
+        """
+        returns the reachable nodes in the order given by self._reorder_method
+        """
+        if self._reorder_method == 'input':
+            return [v for v in self._graph if v in self._reachable]  # dictionaries keep the order of insertion
+
+        if self._reorder_method == 'bfs':
+            order = [self._root]
+            visited = {self._root}
+            for v in order:  # the list grows while we go through it, so it works as the queue
+                for neighbour in self._graph[v]:
+                    if neighbour not in visited:
+                        visited.add(neighbour)
+                        order.append(neighbour)
+            return order
+
+        nodes = [v for component in self._components for v in component]
+        if self._reorder_method == 'hilbert':
+            xs = [self._coordinates[v][0] for v in nodes]
+            ys = [self._coordinates[v][1] for v in nodes]
+            min_x, min_y = min(xs), min(ys)
+            # scales the coordinates to the grid, keeping the aspect ratio
+            scale = (HILBERT_SIDE - 1) / max(max(xs) - min_x, max(ys) - min_y, 1e-12)
+            keys = {v: _hilbert_index(int((x - min_x) * scale), int((y - min_y) * scale), HILBERT_SIDE)
+                    for (v, x, y) in zip(nodes, xs, ys)}
+            return sorted(nodes, key=lambda v: keys[v])
+
+        # reverse Cuthill-McKee, on the graph where edge directions are ignored. Each breadth-first search starts from
+        # an unvisited node of smallest degree, and visits the neighbours of each node by increasing degree
+        neighbours = {v: (self._graph[v] | self._inEdges[v]) & self._reachable for v in nodes}
+        degree = {v: len(neighbours[v]) for v in nodes}
+        order = []
+        visited = set()
+        for start in sorted(nodes, key=lambda v: degree[v]):
+            if start in visited:
+                continue
+            visited.add(start)
+            queue = [start]
+            for v in queue:
+                for neighbour in sorted(neighbours[v] - visited, key=lambda w: degree[w]):
+                    visited.add(neighbour)
+                    queue.append(neighbour)
+            order.extend(queue)
+        order.reverse()
+        return order
+
+    def _new_int_arrays(self):
+        """
+        returns a (dist, prev) pair of typed arrays for the integer-weight mode, with every node unreachable except the
+        root, which is at distance 0
+        """
+        r = self._int_num_reachable
+        dist = array(self._int_typecode, [self._int_sentinel]) * r
+        prev = array(self._int_offsets.typecode, [-1]) * r
+        dist[self._int_index[self._root]] = 0
+        return dist, prev
+
+    def _int_value(self, dist, node):
+        """
+        returns the distance of node in the typed array dist, or None if node is unreachable
+        """
+        i = self._int_index.get(node)
+        if i is None or i >= len(dist) or dist[i] == self._int_sentinel:
+            return None
+        return dist[i]
+
+    def _int_parent(self, prev, node):
+        """
+        returns the parent of node as recorded in the typed array prev, or None if node has no parent
+        """
+        i = self._int_index.get(node)
+        if i is None or i >= len(prev) or prev[i] < 0:
+            return None
+        return self._int_nodes[prev[i]]
+
+    def _int_tree(self, prev):
+        """
+        returns the edge set of the shortest path tree recorded in the typed array prev, including (None, root)
+        """
+        root = self._int_index[self._root]
+        return [(None if p < 0 else self._int_nodes[p], self._int_nodes[i])
+                for (i, p) in enumerate(prev) if p >= 0 or i == root]
+
+    def _dag_shortest_paths_int(self, dist, prev):
+        """
+        The integer-weight version of self._dag_shortest_paths(), relaxing the edges in topological order.
+        """
+        offsets, targets, weights = self._int_offsets, self._int_targets, self._int_weights
+        sentinel = self._int_sentinel
+        for v in self._int_topo:
+            d_v = dist[v]
+            if d_v == sentinel:
+                continue
+            for e in range(offsets[v], offsets[v + 1]):
+                w = targets[e]
+                new_distance = d_v + weights[e]
+                if new_distance < dist[w]:
+                    dist[w] = new_distance
+                    prev[w] = v
+
+    def _dijkstra_int(self):
+        """
+        Dijkstra's algorithm for the integer-weight mode.
+        When the costs are non-negative and the largest cost is small, the priority queue is a bucket queue (Dial's
+        algorithm): a circular list of max_cost + 1 buckets, where the bucket at position d % (max_cost + 1) holds the
+        nodes at distance d. Every distance in the queue is within max_cost of the smallest one, so the buckets are
+        never shared by two distances, and the smallest distance is found by moving through the buckets in order
+        instead of by comparisons. Otherwise, the same heap as in self._dijkstra() is used, on the typed arrays.
+        """
+        self._build_int_arrays()
+        dist, prev = self._new_int_arrays()
+        self._int_d_dist, self._int_d_prev = dist, prev
+        if self._is_dag:
+            self._dag_shortest_paths_int(dist, prev)
+            return
+
+        offsets, targets, weights = self._int_offsets, self._int_targets, self._int_weights
+        root = self._int_index[self._root]
+        r = self._int_num_reachable
+        extracted = bytearray(r)
+        max_cost = max(islice(weights, offsets[r]), default=0)
+        if min(islice(weights, offsets[r]), default=0) >= 0 and max_cost <= max(r, 1024):
+            num_buckets = max_cost + 1
+            buckets = [[] for _ in range(num_buckets)]
+            buckets[0].append(root)
+            queued = 1  # number of entries in all the buckets
+            current = 0  # the distance of the nodes in the current bucket
+            while queued:
+                bucket = buckets[current % num_buckets]
+                while bucket:  # edges of cost 0 add to the current bucket while it is being emptied
+                    v = bucket.pop()
+                    queued -= 1
+                    if dist[v] == current and not extracted[v]:
+                        extracted[v] = 1
+                        for e in range(offsets[v], offsets[v + 1]):
+                            w = targets[e]
+                            new_distance = current + weights[e]
+                            if new_distance < dist[w]:
+                                dist[w] = new_distance
+                                prev[w] = v
+                                buckets[new_distance % num_buckets].append(w)
+                                queued += 1
+                current += 1
+        else:
+            d = [(0, root)]
+            while d:
+                (d_v, v) = heapq.heappop(d)
+                if d_v == dist[v] and not extracted[v]:
+                    extracted[v] = 1
+                    for e in range(offsets[v], offsets[v + 1]):
+                        w = targets[e]
+                        new_distance = d_v + weights[e]
+                        if new_distance < dist[w]:
+                            dist[w] = new_distance
+                            prev[w] = v
+                            heapq.heappush(d, (new_distance, w))
+
+    def _bellmanford_int(self):
+        """
+        Bellman-Ford's algorithm for the integer-weight mode, returning a node affected by a negative cycle, or None.
+        This keeps a single distance array, updated in place, and stops as soon as a round changes nothing. If the
+        rounds have not settled after (number of reachable nodes - 1) of them, or a distance drops below
+        -self._int_bound, which is less than the cost of any simple path, there is a negative cycle. Since distances
+        stay within that bound otherwise, they never overflow the typed array.
+        """
+        self._build_int_arrays()
+        dist, prev = self._new_int_arrays()
+        self._int_bf_dist, self._int_bf_prev = dist, prev
+        if self._is_dag:
+            self._dag_shortest_paths_int(dist, prev)
+            return None
+
+        offsets, targets, weights = self._int_offsets, self._int_targets, self._int_weights
+        sentinel = self._int_sentinel
+        lowest = -self._int_bound
+        r = self._int_num_reachable
+        for k in range(1, r):
+            changed = False
+            for v in self._int_topo:  # in topological order, distances reach later components in fewer rounds
+                d_v = dist[v]
+                if d_v == sentinel:
+                    continue
+                for e in range(offsets[v], offsets[v + 1]):
+                    w = targets[e]
+                    new_distance = d_v + weights[e]
+                    if new_distance < dist[w]:
+                        if new_distance < lowest:
+                            self._bf_cycle_node = self._int_nodes[w]
+                            return self._bf_cycle_node
+                        dist[w] = new_distance
+                        prev[w] = v
+                        changed = True
+            if not changed:
+                return None
+
+        # (One more iteration to check the negative cycle)
+        for node in self._cyclic_nodes:
+            v = self._int_index[node]
+            for e in range(offsets[v], offsets[v + 1]):
+                if dist[v] + weights[e] < dist[targets[e]]:
+                    self._bf_cycle_node = self._int_nodes[targets[e]]
+                    return self._bf_cycle_node
+        return None
@@ -8,6 +8,7 @@ class NegativeTest:
         self._test_num = number_of_tests
         self._random_pos_graphs = self._generate_pos()
         self._random_neg_graphs = self._generate_neg()
+        self._random_structured_graphs = self._generate_structured()
 
     def _generate_pos(self):
         """
@@ -59,6 +60,51 @@ class NegativeTest:
 
         return graph_list
 
+    def _generate_structured(self):
+        """
+        returns a list of randomly-generated graphs, built to go through the preprocessing of the graph. In turn, they
+        are:
+            DAGs with negative edges, where every edge goes from a node to a larger one
+            graphs whose nodes from num_nodes // 2 on cannot be reached from the root, and hold a negative cycle
+            graphs with a negative cycle reachable from the root, which is added after the distances were computed
+        """
+        graph_list = []
+
+        for i in range(self._test_num):
+            g = ShortestPathGraph(0)
+            num_nodes = randrange(5, 10)
+            node_list = range(num_nodes)
+            g.set_nodes(node_list)
+
+            if i % 3 == 0:
+                for node in node_list:
+                    later = range(node + 1, num_nodes)
+                    neighbours = sample(later, randrange(min(3, len(later)) + 1))
+                    g.set_edges([(node, neighbour, randrange(-10, 10)) for neighbour in neighbours])
+            elif i % 3 == 1:
+                half = num_nodes // 2
+                for node in node_list:
+                    if node < half:  # the edges of the reachable half stay inside it
+                        neighbours = sample(range(half), randrange(half))
+                        g.set_edges([(node, neighbour, randrange(1, 30)) for neighbour in neighbours])
+                    else:
+                        neighbours = sample(node_list, randrange(4))
+                        g.set_edges([(node, neighbour, randrange(-10, 10)) for neighbour in neighbours])
+                g.set_edges([(half, half + 1, -5), (half + 1, half, -5)])
+            else:
+                for node in node_list:
+                    neighbours = sample(node_list, randrange(4))
+                    g.set_edges([(node, neighbour, randrange(1, 30)) for neighbour in neighbours])
+                g.set_edges([(0, 1, 1)])
+                # computes the distances first, so that the cycle has to be found once the graph has changed
+                g.dijkstra_get_dist(1)
+                g.bellmanford_get_dist(1)
+                g.set_edges([(1, 2, 1), (2, 1, -5)])
+
+            graph_list.append(g)
+
+        return graph_list
+
     def get_graph(self, index):
         """
         returns the graph from the list of random graphs, specified by the index
@@ -73,6 +119,15 @@ class NegativeTest:
     def run_correctness_neg(self):
         TestTools.correctness_test_2(self._random_neg_graphs)
 
+    def run_integer_weights_correctness(self):
+        TestTools.integer_weights_test(self._random_neg_graphs)
+
+    def run_reorder_correctness(self):
+        TestTools.reorder_test(self._random_neg_graphs)
+
+    def run_preprocess_correctness(self):
+        TestTools.preprocess_test(self._random_structured_graphs)
+
     def get_performance_data(self):
         """
         Gets two lists of tuples of (n, m, time), where n is the number of nodes, m the number of edges, and
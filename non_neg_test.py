@@ -70,6 +70,30 @@ class NonNegativeTest:
                 print("Test " + str(test_num) + " passed.")
                 test_num += 1
 
+    def run_k_paths_correctness(self, k=5):
+        """
+        Runs the k shortest paths test on all the randomly generated graphs, with non-negative edges
+        """
+        TestTools.k_paths_test(self._random_graphs, k)
+
+    def run_integer_weights_correctness(self):
+        """
+        Runs the integer-weight mode test on all the randomly generated graphs, with non-negative edges
+        """
+        TestTools.integer_weights_test(self._random_graphs)
+
+    def run_external_correctness(self):
+        """
+        Runs the external-memory Dijkstra test on all the randomly generated graphs, with non-negative edges
+        """
+        TestTools.external_test(self._random_graphs)
+
+    def run_reorder_correctness(self):
+        """
+        Runs the node reordering test on all the randomly generated graphs, with non-negative edges
+        """
+        TestTools.reorder_test(self._random_graphs)
+
     def get_performance_data(self):
         """
         Gets two lists of tuples of (n, m, time), where n is the number of nodes, m the number of edges, and
@@ -5,6 +5,8 @@ requires matplotlib as dependency
 from non_neg_test import *
 from neg_test import *
 from math import log
+from random import shuffle
+from statistics import median
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -112,6 +114,72 @@ class PerformanceTest:
         plt.legend(loc='upper left')
         plt.show()
 
+    @staticmethod
+    def generate_grid(side, neg_cost=False):
+        """
+        generates a side * side grid graph in the integer-weight mode, where each node has an edge to each of its
+        neighbours in the grid. The nodes are numbered in random order, as if they came from an upstream system, and
+        are added to the graph in the order of their numbers.
+        returns the graph and the dictionary mapping each node to its (row, column) position in the grid
+        """
+        ids = list(range(side * side))
+        shuffle(ids)
+        g = ShortestPathGraph(ids[0], integer_weights=True)
+        g.set_nodes(range(side * side))
+        edges = []
+        coordinates = dict()
+        for i in range(side):
+            for j in range(side):
+                coordinates[ids[i * side + j]] = (i, j)
+                for (a, b) in [(i + 1, j), (i - 1, j), (i, j + 1), (i, j - 1)]:
+                    if 0 <= a < side and 0 <= b < side:
+                        cost = randrange(1, 30) if not neg_cost else randrange(-5, 30)
+                        edges.append((ids[i * side + j], ids[a * side + b], cost))
+        g.set_edges(edges)
+        return g, coordinates
+
+    def plot_compare_reorder(self, side=300, repeats=5):
+        """
+        generates a plot that shows the median time of repeats runs of dijkstra on a large grid graph, with the nodes
+        stored in the default topological order of their components, in the upstream order of their numbers, and in the
+        bfs, rcm and hilbert orders. Every run relaxes each edge once, whatever the order, so the times only differ by
+        how the order lays out the arrays. Bellman-Ford is not timed: it stops once a round changes nothing, and the
+        order of its sweeps changes how many rounds that takes, so its time would measure the rounds instead.
+        CPython cannot read the hardware cache-miss counters, so the average distance in the arrays between the two
+        nodes of an edge is printed as well: the smaller it is, the fewer cache lines the relaxation loops touch. For
+        the actual counts, run this script under `perf stat -e cache-misses`.
+        """
+        g, coordinates = self.generate_grid(side)
+        labels = ["Topological", "Input", "BFS", "RCM", "Hilbert"]
+        methods = ['topological', 'input', 'bfs', 'rcm', 'hilbert']
+        d_times = []
+        for label, method in zip(labels, methods):
+            times = []
+            for _ in range(repeats):
+                g.reorder_nodes(method, coordinates)  # forgets the distances, so that they are computed again
+                span = g.get_edge_span()  # also stores the graph in the new order, which is then not timed
+
+                d_start = time()
+                g.dijkstra_get_dist(g.get_root())
+                d_end = time()
+                times.append(d_end - d_start)
+
+            d_times.append(median(times))
+            print(label + ": average edge span " + str(round(span, 1)) + ", Dijkstra median " +
+                  str(round(d_times[-1], 3)) + "s, from " + str(round(min(times), 3)) + "s to " +
+                  str(round(max(times), 3)) + "s")
+
+        x = np.arange(len(labels))
+        width = 0.4
+        fig, ax = plt.subplots()
+        ax.bar(x, d_times, width, color="red", label="Dijkstra")
+        ax.set_xticks(x)
+        ax.set_xticklabels(labels)
+        plt.ylabel("median time")
+        plt.title("Dijkstra running times for a " + str(side) + " x " + str(side) + " grid with reordered nodes")
+        plt.legend(loc='upper left')
+        plt.show()
+
 
 test = PerformanceTest(100)
 test.plot_bf_poly(brute_force_show=True)
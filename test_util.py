@@ -3,8 +3,12 @@ Tools used to test our graphs in both negative and non-negative edge graphs.
 Author: Qi Ying Lim
 """
 
-from random import choice
+from random import choice, random
 from time import time
+import os
+import tempfile
+from graph import ShortestPathGraph
+from external_graph import ExternalShortestPathGraph, min_memory_limit, write_graph_file
 
 INF = 9999
 
@@ -80,6 +84,217 @@ class TestTools:
                     print("Test " + str(test_num) + " passed.")
                 test_num += 1
 
+    @staticmethod
+    def k_paths_test(graph_list, k=5):
+        """
+        Runs test on all the randomly generated graphs, with non-negative edges
+        Checks that the costs of the k shortest paths computed by Yen's algorithm are equal to the k smallest costs
+        among all the paths found by the brute force method, and that the paths returned are distinct simple paths.
+        """
+        test_num = 1  # counter for the number of tests
+        for graph in graph_list:
+            try:
+                node = choice(list(graph.get_nodes()))  # randomly chooses some node in the node list
+            except IndexError:
+                print('graph has no nodes')
+            else:
+                paths = TestTools.find_paths(graph, graph.get_root(), node)
+                brute_costs = sorted(sum([graph.get_edge_cost(path[i], path[i + 1]) for i in range(len(path) - 1)])
+                                     for path in paths)[:k]
+                k_paths = graph.dijkstra_get_k_paths(node, k)
+                k_costs = [cost for (path, cost) in k_paths]
+                assert brute_costs == k_costs, "brute costs are " + str(brute_costs) + " while Yen computed " + str(
+                    k_costs)
+                assert len(set(tuple(path) for (path, cost) in k_paths)) == len(k_paths), "repeated path"
+                assert all(len(set(path)) == len(path) for (path, cost) in k_paths), "path is not simple"
+                print("Test " + str(test_num) + " passed.")
+                test_num += 1
+
+    @staticmethod
+    def copy_graph(graph, integer_weights=False):
+        """
+        returns a new ShortestPathGraph with the same root, nodes and edges as graph
+        """
+        copy = ShortestPathGraph(graph.get_root(), integer_weights=integer_weights)
+        copy.set_nodes(graph.get_nodes())
+        edges = [(v, w, graph.get_edge_cost(v, w)) for v in graph.get_nodes() for w in graph.get_out_neighbours(v)]
+        copy.set_edges(edges)
+        return copy
+
+    @staticmethod
+    def is_non_negative(graph):
+        """
+        returns True if no edge of graph has a negative cost
+        """
+        return all(graph.get_edge_cost(v, w) >= 0 for v in graph.get_nodes() for w in graph.get_out_neighbours(v))
+
+    @staticmethod
+    def path_cost(graph, path):
+        """
+        returns the sum of the costs of the edges along path
+        """
+        return sum([graph.get_edge_cost(path[i], path[i + 1]) for i in range(len(path) - 1)])
+
+    @staticmethod
+    def default_dist(dist):
+        """
+        returns dist, a distance or a tuple of distances returned in the integer-weight mode, with float('inf') and
+        float('-inf') replaced by INF and -INF, as they are returned in the default mode
+        """
+        if isinstance(dist, tuple):
+            return tuple(TestTools.default_dist(d) for d in dist)
+        if dist == float('inf'):
+            return INF
+        if dist == float('-inf'):
+            return -INF
+        return dist
+
+    @staticmethod
+    def integer_weights_test(graph_list):
+        """
+        Runs test on all the randomly generated graphs, with both and postive negative edges
+        Each graph is copied into a graph in the integer-weight mode, and the distances computed by Bellman-Ford on
+        both graphs are checked to be equal for every node. If the graph has only non-negative edges, the same is
+        checked for Dijkstra and for the costs of the 3 shortest paths, whose edge costs come from the typed arrays.
+        """
+        test_num = 1  # counter for the number of tests
+        for graph in graph_list:
+            int_graph = TestTools.copy_graph(graph, integer_weights=True)
+            non_negative = TestTools.is_non_negative(graph)
+            for node in graph.get_nodes():
+                bf_dist = graph.bellmanford_get_dist(node)
+                int_bf_dist = TestTools.default_dist(int_graph.bellmanford_get_dist(node))
+                if bf_dist[1] == -INF:
+                    assert int_bf_dist[1] == -INF, "negative cycle missed by the integer-weight mode"
+                else:
+                    assert bf_dist == int_bf_dist, "bf computed " + str(bf_dist) + " while the integer-weight mode " \
+                                                   "computed " + str(int_bf_dist)
+                if non_negative:
+                    d_dist = graph.dijkstra_get_dist(node, numerical=True)
+                    int_d_dist = TestTools.default_dist(int_graph.dijkstra_get_dist(node, numerical=True))
+                    assert d_dist == int_d_dist, "d computed " + str(d_dist) + " while the integer-weight mode " \
+                                                 "computed " + str(int_d_dist)
+                    k_costs = [cost for (path, cost) in graph.dijkstra_get_k_paths(node, 3)]
+                    int_k_costs = [cost for (path, cost) in int_graph.dijkstra_get_k_paths(node, 3)]
+                    assert k_costs == int_k_costs, "Yen computed " + str(k_costs) + " while the integer-weight mode " \
+                                                   "computed " + str(int_k_costs)
+            print("Test " + str(test_num) + " passed.")
+            test_num += 1
+
+    @staticmethod
+    def reorder_test(graph_list):
+        """
+        Runs test on all the randomly generated graphs, with both and postive negative edges
+        Each graph is copied into graphs in the integer-weight mode, one stored in the default order, and one for each
+        of the input, bfs, rcm and hilbert orders, with random node coordinates. For every node, the distances computed
+        by Bellman-Ford on the reordered graphs are checked to be equal to those of the graph in the default order, and
+        the paths returned are checked to be paths from the root whose cost is that distance. If the graph has only
+        non-negative edges, the same is checked for Dijkstra.
+        """
+        test_num = 1  # counter for the number of tests
+        for graph in graph_list:
+            original = TestTools.copy_graph(graph, integer_weights=True)
+            non_negative = TestTools.is_non_negative(graph)
+            coordinates = {node: (random(), random()) for node in graph.get_nodes()}
+            for method in ['input', 'bfs', 'rcm', 'hilbert']:
+                reordered = TestTools.copy_graph(graph, integer_weights=True)
+                reordered.reorder_nodes(method, coordinates)
+                for node in graph.get_nodes():
+                    bf_dist = TestTools.default_dist(original.bellmanford_get_dist(node))
+                    reordered_bf_dist = TestTools.default_dist(reordered.bellmanford_get_dist(node))
+                    if bf_dist[1] == -INF:
+                        assert reordered_bf_dist[1] == -INF, "negative cycle missed with the " + method + " order"
+                        continue
+                    assert bf_dist == reordered_bf_dist, "bf computed " + str(bf_dist) + " while the " + method + \
+                                                         " order computed " + str(reordered_bf_dist)
+                    if bf_dist[0] != INF:
+                        path = reordered.bellmanford_get_path(node)
+                        assert path[0] == graph.get_root() and path[-1] == node, "bad path " + str(path)
+                        assert TestTools.path_cost(graph, path) == bf_dist[0], "bad path " + str(path)
+                    if non_negative:
+                        d_dist = TestTools.default_dist(original.dijkstra_get_dist(node, numerical=True))
+                        reordered_d_dist = TestTools.default_dist(reordered.dijkstra_get_dist(node, numerical=True))
+                        assert d_dist == reordered_d_dist, "d computed " + str(d_dist) + " while the " + method + \
+                                                           " order computed " + str(reordered_d_dist)
+                        if d_dist != INF:
+                            path = reordered.dijkstra_get_path(node)
+                            assert path[0] == graph.get_root() and path[-1] == node, "bad path " + str(path)
+                            assert TestTools.path_cost(graph, path) == d_dist, "bad path " + str(path)
+            print("Test " + str(test_num) + " passed.")
+            test_num += 1
+
+    @staticmethod
+    def reachable_cycle_costs(graph):
+        """
+        returns the costs of all the simple cycles through nodes reachable from the root of graph, found by brute force
+        """
+        costs = []
+        for u in graph.get_nodes():
+            if TestTools.find_paths(graph, graph.get_root(), u):
+                for w in graph.get_out_neighbours(u):
+                    for path in TestTools.find_paths(graph, w, u):
+                        costs.append(graph.get_edge_cost(u, w) + TestTools.path_cost(graph, path))
+        return costs
+
+    @staticmethod
+    def preprocess_test(graph_list):
+        """
+        Runs test on graphs built to go through the preprocessing: DAGs with negative edges, graphs with parts that
+        cannot be reached from the root, and graphs with a negative cycle.
+        If a negative cycle can be reached from the root, Bellman-Ford must report it. Otherwise, the distances computed
+        by Bellman-Ford for every node are checked to be equal to those of the brute force method, in the default and in
+        the integer-weight mode. If the reachable part of the graph has no cycle, or no negative edge, the same is
+        checked for Dijkstra.
+        """
+        test_num = 1  # counter for the number of tests
+        for graph in graph_list:
+            int_graph = TestTools.copy_graph(graph, integer_weights=True)
+            cycle_costs = TestTools.reachable_cycle_costs(graph)
+            if any(cost < 0 for cost in cycle_costs):
+                for g in [graph, int_graph]:
+                    bf_dist = TestTools.default_dist(g.bellmanford_get_dist(g.get_root()))
+                    assert bf_dist[1] == -INF, "negative cycle missed, bf computed " + str(bf_dist)
+            else:
+                check_dijkstra = not cycle_costs or TestTools.is_non_negative(graph)
+                for node in graph.get_nodes():
+                    (brute_path, brute_dist) = TestTools.brute_force_result(graph, node)
+                    for g in [graph, int_graph]:
+                        bf_dist = TestTools.default_dist(g.bellmanford_get_dist(node))
+                        assert bf_dist == (brute_dist, brute_dist), "brute distance is " + str(brute_dist) + \
+                                                                    " while bf computed " + str(bf_dist)
+                        if check_dijkstra:
+                            d_dist = TestTools.default_dist(g.dijkstra_get_dist(node, numerical=True))
+                            assert brute_dist == d_dist, "brute distance is " + str(brute_dist) + \
+                                                         " while d computed " + str(d_dist)
+            print("Test " + str(test_num) + " passed.")
+            test_num += 1
+
+    @staticmethod
+    def external_test(graph_list, memory_limit=None):
+        """
+        Runs test on all the randomly generated graphs, with non-negative edges
+        Each graph is written to an edge file and loaded as an ExternalShortestPathGraph, and the distances computed by
+        Dijkstra on both graphs are checked to be equal for every node. By default, memory_limit is the smallest one
+        accepted, which leaves room for only a few queue entries, so that the priority queue spills to disk.
+        """
+        test_num = 1  # counter for the number of tests
+        for graph in graph_list:
+            (handle, path) = tempfile.mkstemp()
+            os.close(handle)
+            try:
+                write_graph_file(graph, path)
+                limit = memory_limit if memory_limit is not None else min_memory_limit(graph.get_num_nodes())
+                external = ExternalShortestPathGraph(path, graph.get_root(), limit)
+                for node in graph.get_nodes():
+                    d_dist = graph.dijkstra_get_dist(node, numerical=True)
+                    external_dist = external.dijkstra_get_dist(node, numerical=True)
+                    assert d_dist == external_dist, "d computed " + str(d_dist) + " while the external Dijkstra " \
+                                                    "computed " + str(external_dist)
+            finally:
+                os.remove(path)
+            print("Test " + str(test_num) + " passed.")
+            test_num += 1
+
     @staticmethod
     def get_performance(graph_list):
         """
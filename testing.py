@@ -14,10 +14,37 @@ def main():
     print("Non-Negative test complete. \n")
     print("***********************************\n")
 
+    print("Testing the 5 shortest paths on the same 100 Graphs. \n")
+    non_neg.run_k_paths_correctness(5)
+    print("K shortest paths test complete. \n")
+    print("***********************************\n")
+
+    print("Testing the external-memory Dijkstra on the same 100 Graphs. \n")
+    non_neg.run_external_correctness()
+    print("External-memory test complete. \n")
+    print("***********************************\n")
+
     print("Generating 100 Graphs with negative edge weights. \n")
     neg2 = NegativeTest(100)
     neg2.run_correctness_neg()
     print("Negative test complete. \n")
+    print("***********************************\n")
+
+    print("Testing the integer-weight mode on the same Graphs. \n")
+    non_neg.run_integer_weights_correctness()
+    neg2.run_integer_weights_correctness()
+    print("Integer-weight test complete. \n")
+    print("***********************************\n")
+
+    print("Testing node reordering on the same Graphs. \n")
+    non_neg.run_reorder_correctness()
+    neg2.run_reorder_correctness()
+    print("Reordering test complete. \n")
+    print("***********************************\n")
+
+    print("Generating 100 DAGs, Graphs with unreachable parts and Graphs with negative cycles. \n")
+    neg2.run_preprocess_correctness()
+    print("Preprocessing test complete. \n")
 
     # Compare bellmanford and Dikstra
     print("Generating 10 Graphs with negative edge weights to compare jikstra and bellmanford. \n")